@@ -1,11 +1,129 @@
 import base64
 import email
+import re
+import time
 from typing import Optional
+from google.auth.exceptions import RefreshError
 from googleapiclient.errors import HttpError
-from .gmail_service import get_gmail_service
 
 from langchain_core.tools import tool
 
+def _get_service():
+    """
+    Retrieve Gmail API service, importing the client libraries on first use.
+
+    Returns:
+        Gmail API service object
+    """
+    from .gmail_service import get_gmail_service
+    return get_gmail_service()
+
+def _reset_service_on_auth_error(error: Exception):
+    """
+    Drop the cached Gmail API service when its credentials were rejected.
+
+    Args:
+        error (Exception): HttpError or RefreshError raised by the API call
+    """
+    if isinstance(error, RefreshError) or (isinstance(error, HttpError) and error.resp.status == 401):
+        from .gmail_service import reset_gmail_service
+        reset_gmail_service()
+
+# Maximum number of calls sent in a single batch request
+BATCH_SIZE = 50
+
+def _decode_body(data: str) -> str:
+    """
+    Decode a base64url-encoded message body to text.
+
+    Args:
+        data (str): base64url-encoded body data, with or without padding
+
+    Returns:
+        str: Decoded body text
+    """
+    data += '=' * (-len(data) % 4)
+    return base64.urlsafe_b64decode(data).decode('utf-8', errors='replace')
+
+# Longest line allowed in a message without folding or encoding (RFC 5322 section 2.1.1)
+MAX_LINE_LENGTH = 998
+
+# Line breaks recognised in message bodies
+_LINE_BREAK = re.compile(r'\r?\n')
+
+def _build_simple_mail(to: str, subject: str, body: str, extra_headers: Optional[dict] = None) -> bytes:
+    """
+    Build a plain text email as raw RFC 5322 bytes.
+
+    Headers are written directly when they are ASCII-only and every header and
+    body line fits in 998 bytes; otherwise the message is built with EmailMessage, which takes
+    care of header encoding and content transfer encoding.
+
+    Args:
+        to (str): Recipient email address
+        subject (str): Email subject
+        body (str): Email body content
+        extra_headers (Optional[dict]): Additional headers to set on the message
+
+    Returns:
+        bytes: Encoded email message
+    """
+    headers = {'To': to, 'Subject': subject, **(extra_headers or {})}
+    header_lines = [f"{name}: {value}" for name, value in headers.items()]
+
+    # Only CRLF and LF are line breaks; a trailing one does not start a new line
+    lines = _LINE_BREAK.split(body)
+    if lines[-1] == '':
+        lines.pop()
+
+    if (
+        all(
+            line.isascii() and '\r' not in line and '\n' not in line and len(line) <= MAX_LINE_LENGTH
+            for line in header_lines
+        )
+        and all('\r' not in line and len(line.encode('utf-8')) <= MAX_LINE_LENGTH for line in lines)
+    ):
+        header_block = "".join(f"{line}\r\n" for line in header_lines)
+        return (
+            f"{header_block}"
+            "MIME-Version: 1.0\r\n"
+            "Content-Type: text/plain; charset=utf-8\r\n"
+            "Content-Transfer-Encoding: 8bit\r\n"
+            "\r\n"
+            + "\r\n".join(lines) + "\r\n"
+        ).encode('utf-8')
+
+    message = email.message.EmailMessage()
+    message.set_content(body)
+    for name, value in headers.items():
+        message[name] = value
+    return message.as_bytes()
+
+# Label name -> ID mappings per user, stored with the time they were fetched
+_LABEL_CACHE: dict[str, tuple[float, dict[str, str]]] = {}
+
+def _get_labels(service, user_id: str = 'me', ttl: float = 300, force: bool = False) -> dict[str, str]:
+    """
+    Return a mapping of label names to label IDs, cached for `ttl` seconds.
+
+    Args:
+        service: Gmail API service object
+        user_id (str): Gmail user ID (default 'me')
+        ttl (float): Number of seconds a cached mapping stays valid
+        force (bool): Whether to bypass the cache and fetch the labels again
+
+    Returns:
+        dict[str, str]: Mapping of label names to label IDs
+    """
+    cached = _LABEL_CACHE.get(user_id)
+    if cached and not force and time.monotonic() - cached[0] < ttl:
+        return cached[1]
+
+    results = service.users().labels().list(userId=user_id, fields='labels(id,name)').execute()
+    mapping = {label['name']: label['id'] for label in results.get('labels', [])}
+    _LABEL_CACHE[user_id] = (time.monotonic(), mapping)
+    return mapping
+
 @tool
 def list_email_labels():
     """
@@ -15,7 +133,7 @@ def list_email_labels():
         str: Formatted list of available labels
     """
     try:
-        service = get_gmail_service()
+        service = _get_service()
         results = service.users().labels().list(userId="me").execute()
         labels = results.get("labels", [])
 
@@ -30,7 +148,8 @@ def list_email_labels():
 
         return f"Available Labels:\n{label_list}"
 
-    except HttpError as error:
+    except (HttpError, RefreshError) as error:
+        _reset_service_on_auth_error(error)
         return f"An error occurred while listing labels: {error}"
 
 @tool
@@ -46,14 +165,16 @@ def list_recent_emails(label_name: Optional[str] = None, max_results: int = 10):
         str: Formatted list of recent emails
     """
     try:
-        service = get_gmail_service()
+        service = _get_service()
 
         # Get label ID if a label name is provided
         label_id = None
         if label_name:
-            results = service.users().labels().list(userId="me").execute()
-            labels = results.get("labels", [])
-            label_id = next((label['id'] for label in labels if label['name'] == label_name), None)
+            label_id = _get_labels(service).get(label_name)
+
+            # The label may have been created since the labels were cached
+            if not label_id:
+                label_id = _get_labels(service, force=True).get(label_name)
 
             if not label_id:
                 return f"Label '{label_name}' not found."
@@ -73,15 +194,40 @@ def list_recent_emails(label_name: Optional[str] = None, max_results: int = 10):
         if not messages:
             return "No emails found."
 
+        # Fetch message metadata in batched requests instead of one call per message
+        fetched = {}
+
+        def collect(request_id, response, exception):
+            if exception is not None:
+                raise exception
+            fetched[request_id] = response
+
+        for start in range(0, len(messages), BATCH_SIZE):
+            batch = service.new_batch_http_request()
+            for i, msg in enumerate(messages[start:start + BATCH_SIZE], start):
+                batch.add(
+                    service.users().messages().get(
+                        userId='me',
+                        id=msg['id'],
+                        format='metadata',
+                        metadataHeaders=['Subject', 'From', 'Date'],
+                        fields='id,payload/headers'
+                    ),
+                    callback=collect,
+                    request_id=str(i)
+                )
+            batch.execute()
+
         # Format email details
         email_details = []
         for i, msg in enumerate(messages, 1):
-            message = service.users().messages().get(userId='me', id=msg['id']).execute()
+            message = fetched[str(i - 1)]
             headers = message['payload']['headers']
 
-            subject = next((h['value'] for h in headers if h['name'] == 'Subject'), 'No Subject')
-            sender = next((h['value'] for h in headers if h['name'] == 'From'), 'Unknown Sender')
-            date = next((h['value'] for h in headers if h['name'] == 'Date'), 'No Date')
+            hdr = {h['name'].lower(): h['value'] for h in headers}
+            subject = hdr.get('subject', 'No Subject')
+            sender = hdr.get('from', 'Unknown Sender')
+            date = hdr.get('date', 'No Date')
 
             email_details.append(
                 f"{i}. From: {sender}\n"
@@ -92,7 +238,8 @@ def list_recent_emails(label_name: Optional[str] = None, max_results: int = 10):
 
         return "Recent Emails:\n" + "\n\n".join(email_details)
 
-    except HttpError as error:
+    except (HttpError, RefreshError) as error:
+        _reset_service_on_auth_error(error)
         return f"An error occurred while listing emails: {error}"
 
 @tool
@@ -107,25 +254,31 @@ def read_email_content(message_id: str):
         str: Formatted email content
     """
     try:
-        service = get_gmail_service()
-
-        # Get the full message
-        message = service.users().messages().get(userId='me', id=message_id).execute()
+        service = _get_service()
+
+        # Get the full message, restricted to the headers and body data we read
+        message = service.users().messages().get(
+            userId='me',
+            id=message_id,
+            format='full',
+            fields='payload(headers,parts(mimeType,body/data),body/data)'
+        ).execute()
 
         # Extract headers
         headers = message['payload']['headers']
-        subject = next((h['value'] for h in headers if h['name'] == 'Subject'), 'No Subject')
-        sender = next((h['value'] for h in headers if h['name'] == 'From'), 'Unknown Sender')
-        date = next((h['value'] for h in headers if h['name'] == 'Date'), 'No Date')
+        hdr = {h['name'].lower(): h['value'] for h in headers}
+        subject = hdr.get('subject', 'No Subject')
+        sender = hdr.get('from', 'Unknown Sender')
+        date = hdr.get('date', 'No Date')
 
         # Extract body
         def get_body(msg):
             if 'parts' in msg['payload']:
                 for part in msg['payload']['parts']:
                     if part['mimeType'] == 'text/plain':
-                        return base64.urlsafe_b64decode(part['body']['data']).decode('utf-8')
+                        return _decode_body(part['body']['data'])
             elif 'body' in msg['payload'] and 'data' in msg['payload']['body']:
-                return base64.urlsafe_b64decode(msg['payload']['body']['data']).decode('utf-8')
+                return _decode_body(msg['payload']['body']['data'])
             return "No readable content found."
 
         body = get_body(message)
@@ -138,7 +291,8 @@ def read_email_content(message_id: str):
             f"Content:\n{body}"
         )
 
-    except HttpError as error:
+    except (HttpError, RefreshError) as error:
+        _reset_service_on_auth_error(error)
         return f"An error occurred while reading email: {error}"
 
 @tool
@@ -155,16 +309,10 @@ def send_email(to: str, subject: str, body: str):
         str: Confirmation or error message
     """
     try:
-        service = get_gmail_service()
-
-        # Construct the email message
-        message = email.message.EmailMessage()
-        message.set_content(body)
-        message['To'] = to
-        message['Subject'] = subject
+        service = _get_service()
 
-        # Encode the message
-        raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
+        # Construct and encode the email message
+        raw_message = base64.urlsafe_b64encode(_build_simple_mail(to, subject, body)).decode('utf-8')
 
         # Send the message
         send_message = service.users().messages().send(
@@ -174,7 +322,8 @@ def send_email(to: str, subject: str, body: str):
 
         return f"Email sent successfully! Message ID: {send_message['id']}"
 
-    except HttpError as error:
+    except (HttpError, RefreshError) as error:
+        _reset_service_on_auth_error(error)
         return f"An error occurred while sending email: {error}"
 
 @tool
@@ -190,38 +339,48 @@ def reply_to_email(message_id: str, reply_text: str):
         str: Confirmation or error message
     """
     try:
-        service = get_gmail_service()
-
-        # Retrieve the original message
-        original_message = service.users().messages().get(userId="me", id=message_id).execute()
+        service = _get_service()
+
+        # Retrieve only the thread and headers of the original message
+        original_message = service.users().messages().get(
+            userId="me",
+            id=message_id,
+            format='metadata',
+            metadataHeaders=['Subject', 'From', 'Message-ID', 'References'],
+            fields='threadId,payload/headers'
+        ).execute()
 
         # Extract headers
         headers = original_message['payload']['headers']
-        subject = next((h['value'] for h in headers if h['name'] == 'Subject'), 'Re: No Subject')
+        hdr = {h['name'].lower(): h['value'] for h in headers}
+        subject = hdr.get('subject', 'Re: No Subject')
         if not subject.startswith('Re: '):
             subject = f'Re: {subject}'
 
         # Find the recipient
-        to_header = next((h['value'] for h in headers if h['name'] == 'From'), '')
-
-        # Construct the reply message
-        message = email.message.EmailMessage()
-        message.set_content(reply_text)
-        message['To'] = to_header
-        message['Subject'] = subject
-        message['In-Reply-To'] = message_id
-        message['References'] = message_id
-
-        # Encode the message
-        raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
+        to_header = hdr.get('from', '')
+
+        # Reference the original RFC 822 Message-ID so clients thread the reply
+        original_id = hdr.get('message-id', message_id)
+        references = f"{hdr['references']} {original_id}" if 'references' in hdr else original_id
+
+        # Construct and encode the reply message
+        message = _build_simple_mail(
+            to_header,
+            subject,
+            reply_text,
+            {'In-Reply-To': original_id, 'References': references}
+        )
+        raw_message = base64.urlsafe_b64encode(message).decode('utf-8')
 
-        # Send the message
+        # Send the message in the original thread
         send_message = service.users().messages().send(
             userId="me", 
-            body={'raw': raw_message}
+            body={'raw': raw_message, 'threadId': original_message['threadId']}
         ).execute()
 
         return f"Reply sent successfully! Message ID: {send_message['id']}"
 
-    except HttpError as error:
+    except (HttpError, RefreshError) as error:
+        _reset_service_on_auth_error(error)
         return f"An error occurred while replying to email: {error}"
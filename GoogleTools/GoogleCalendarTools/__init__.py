@@ -1,2 +1,2 @@
-from .event_tools import list_calendars, list_upcoming_events, create_event, update_event, delete_event
+from .event_tools import list_calendars, list_upcoming_events, create_event, update_event, delete_event, update_events, delete_events
 
@@ -1,11 +1,18 @@
 import os
+import threading
 from google.auth.transport.requests import Request
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from googleapiclient.discovery import build
 from .config import SCOPES, CREDENTIALS_FILE, TOKEN_FILE
 
-def get_calendar_service():
+# Per-thread service cache, since the underlying httplib2 connection is not thread-safe
+_local = threading.local()
+
+# Bumped on reset so every thread rebuilds its cached service
+_generation = 0
+
+def _build_calendar_service():
     """
     Retrieve Google Calendar API service with credentials.
     
@@ -29,4 +36,25 @@ def get_calendar_service():
         with open(TOKEN_FILE, "w") as token:
             token.write(creds.to_json())
     
-    return build("calendar", "v3", credentials=creds)
+    return build("calendar", "v3", credentials=creds, cache_discovery=False)
+
+def get_calendar_service():
+    """
+    Retrieve Google Calendar API service, reusing the one built earlier in this thread.
+    
+    Returns:
+        Google Calendar API service object
+    """
+    generation = _generation
+    service = getattr(_local, 'service', None)
+    if service is None or getattr(_local, 'generation', None) != generation:
+        service = _local.service = _build_calendar_service()
+        _local.generation = generation
+    return service
+
+def reset_calendar_service():
+    """
+    Drop the Google Calendar API service cached by every thread.
+    """
+    global _generation
+    _generation += 1
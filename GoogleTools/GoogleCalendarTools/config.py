@@ -1,8 +1,10 @@
 import os
 from dotenv import load_dotenv
 
-# Load environment variables from a .env file
-load_dotenv()
+# Load environment variables from a .env file, once for all tool configs
+if not os.environ.get('AGENT_TOOLS_DOTENV_LOADED'):
+    load_dotenv()
+    os.environ['AGENT_TOOLS_DOTENV_LOADED'] = '1'
 
 # Define the required Google Calendar API scopes
 SCOPES = ['https://www.googleapis.com/auth/calendar']
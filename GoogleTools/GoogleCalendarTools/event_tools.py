@@ -1,10 +1,90 @@
-from datetime import datetime, timedelta
+import time
+from datetime import datetime, timedelta, timezone
 from typing import Optional
+from google.auth.exceptions import RefreshError
 from googleapiclient.errors import HttpError
-from .calendar_service import get_calendar_service
 
 from langchain_core.tools import tool
 
+def _get_service():
+    """
+    Retrieve Google Calendar API service, importing the client libraries on first use.
+
+    Returns:
+        Google Calendar API service object
+    """
+    from .calendar_service import get_calendar_service
+    return get_calendar_service()
+
+def _reset_service_on_auth_error(error: Exception):
+    """
+    Drop the cached Google Calendar API service when its credentials were rejected.
+
+    Args:
+        error (Exception): HttpError or RefreshError raised by the API call
+    """
+    if isinstance(error, RefreshError) or (isinstance(error, HttpError) and error.resp.status == 401):
+        from .calendar_service import reset_calendar_service
+        reset_calendar_service()
+
+# Last computed time window as (second, days ahead, time_min, time_max)
+_TIME_WINDOW_CACHE = (0, None, '', '')
+
+def _time_window(days: int) -> tuple[str, str]:
+    """
+    Compute the RFC 3339 time range from now to `days` days ahead.
+
+    The strings are reused for calls made within the same second.
+
+    Args:
+        days (int): Number of days to look ahead
+
+    Returns:
+        tuple[str, str]: Start and end of the time range
+    """
+    global _TIME_WINDOW_CACHE
+    second = int(time.time())
+    cached_second, cached_days, time_min, time_max = _TIME_WINDOW_CACHE
+    if cached_second == second and cached_days == days:
+        return time_min, time_max
+
+    now = datetime.fromtimestamp(second, timezone.utc)
+    time_min = now.isoformat().replace('+00:00', 'Z')
+    time_max = (now + timedelta(days=days)).isoformat().replace('+00:00', 'Z')
+    _TIME_WINDOW_CACHE = (second, days, time_min, time_max)
+    return time_min, time_max
+
+# Maximum number of calls the Calendar API accepts in a single batch request
+BATCH_SIZE = 1000
+
+def _execute_in_batches(service, requests):
+    """
+    Execute API requests through batch HTTP requests.
+
+    Args:
+        service: Google Calendar API service object
+        requests (list): List of HttpRequest objects
+
+    Returns:
+        dict: Mapping of request positions to the error raised, if any
+    """
+    errors = {}
+
+    def collect(request_id, response, exception):
+        if exception is not None:
+            if isinstance(exception, HttpError):
+                _reset_service_on_auth_error(exception)
+            errors[int(request_id)] = exception
+
+    # Request IDs are list positions, since the same event ID may appear more than once
+    for start in range(0, len(requests), BATCH_SIZE):
+        batch = service.new_batch_http_request(callback=collect)
+        for i, request in enumerate(requests[start:start + BATCH_SIZE], start):
+            batch.add(request, request_id=str(i))
+        batch.execute()
+
+    return errors
+
 @tool
 def list_calendars():
     """
@@ -14,7 +94,7 @@ def list_calendars():
         str: Formatted list of available calendars
     """
     try:
-        service = get_calendar_service()
+        service = _get_service()
         calendars_result = service.calendarList().list().execute()
         calendars = calendars_result.get('items', [])
 
@@ -29,7 +109,8 @@ def list_calendars():
 
         return f"Available Calendars:\n{calendar_list}"
 
-    except HttpError as error:
+    except (HttpError, RefreshError) as error:
+        _reset_service_on_auth_error(error)
         return f"An error occurred while listing calendars: {error}"
 
 @tool
@@ -46,16 +127,14 @@ def list_upcoming_events(calendar_id: Optional[str] = None, max_results: int = 1
         str: Formatted list of upcoming events
     """
     try:
-        service = get_calendar_service()
+        service = _get_service()
 
         # Use primary calendar if no ID is provided
         if not calendar_id:
             calendar_id = 'primary'
 
         # Calculate time range
-        now = datetime.utcnow()
-        time_min = now.isoformat() + 'Z'
-        time_max = (now + timedelta(days=days_ahead)).isoformat() + 'Z'
+        time_min, time_max = _time_window(days_ahead)
 
         # Retrieve events
         events_result = service.events().list(
@@ -64,7 +143,8 @@ def list_upcoming_events(calendar_id: Optional[str] = None, max_results: int = 1
             timeMax=time_max,
             maxResults=max_results, 
             singleEvents=True,
-            orderBy='startTime'
+            orderBy='startTime',
+            fields='items(id,summary,start,end)'
         ).execute()
 
         events = events_result.get('items', [])
@@ -87,7 +167,8 @@ def list_upcoming_events(calendar_id: Optional[str] = None, max_results: int = 1
 
         return "Upcoming Events:\n" + "\n\n".join(event_details)
 
-    except HttpError as error:
+    except (HttpError, RefreshError) as error:
+        _reset_service_on_auth_error(error)
         return f"An error occurred while listing events: {error}"
 
 @tool
@@ -106,7 +187,7 @@ def create_event(summary: str, start_time: str, end_time: str, description: Opti
         str: Confirmation message or error details
     """
     try:
-        service = get_calendar_service()
+        service = _get_service()
 
         # Use primary calendar if no ID is provided
         if not calendar_id:
@@ -139,7 +220,8 @@ def create_event(summary: str, start_time: str, end_time: str, description: Opti
             f"Event Link: {event.get('htmlLink', 'No link available')}"
         )
 
-    except HttpError as error:
+    except (HttpError, RefreshError) as error:
+        _reset_service_on_auth_error(error)
         return f"An error occurred while creating event: {error}"
 
 @tool
@@ -159,7 +241,7 @@ def update_event(event_id: str, calendar_id: Optional[str] = None, summary: Opti
         str: Confirmation message or error details
     """
     try:
-        service = get_calendar_service()
+        service = _get_service()
 
         # Use primary calendar if no ID is provided
         if not calendar_id:
@@ -191,7 +273,8 @@ def update_event(event_id: str, calendar_id: Optional[str] = None, summary: Opti
             f"Event Link: {updated_event.get('htmlLink', 'No link available')}"
         )
 
-    except HttpError as error:
+    except (HttpError, RefreshError) as error:
+        _reset_service_on_auth_error(error)
         return f"An error occurred while updating event: {error}"
 
 @tool
@@ -207,7 +290,7 @@ def delete_event(event_id: str, calendar_id: Optional[str] = None):
         str: Confirmation message or error details
     """
     try:
-        service = get_calendar_service()
+        service = _get_service()
 
         # Use primary calendar if no ID is provided
         if not calendar_id:
@@ -220,5 +303,106 @@ def delete_event(event_id: str, calendar_id: Optional[str] = None):
 
         return f"Event with ID {event_id} deleted successfully from calendar {calendar_id}."
 
-    except HttpError as error:
-        return f"An error occurred while deleting event: {error}"
\ No newline at end of file
+    except (HttpError, RefreshError) as error:
+        _reset_service_on_auth_error(error)
+        return f"An error occurred while deleting event: {error}"
+
+@tool
+def update_events(updates: list[dict], calendar_id: Optional[str] = None):
+    """
+    Update several existing events in the specified calendar at once.
+
+    Args:
+        updates (list[dict]): Event updates, each with an 'event_id' and any of
+            'summary', 'start_time', 'end_time' (ISO format: YYYY-MM-DDTHH:MM:SS) and 'description'
+        calendar_id (Optional[str]): ID of the calendar (default: primary)
+
+    Returns:
+        str: Confirmation message or error details
+    """
+    try:
+        service = _get_service()
+
+        # Use primary calendar if no ID is provided
+        if not calendar_id:
+            calendar_id = 'primary'
+
+        failures = []
+        event_ids = []
+        requests = []
+        for i, update in enumerate(updates, 1):
+            if not update.get('event_id'):
+                failures.append(f"- Update {i}: missing 'event_id'")
+                continue
+
+            body = {}
+            if update.get('summary'):
+                body['summary'] = update['summary']
+            if update.get('description') is not None:
+                body['description'] = update['description']
+            if update.get('start_time'):
+                body['start'] = {'dateTime': update['start_time']}
+            if update.get('end_time'):
+                body['end'] = {'dateTime': update['end_time']}
+
+            event_ids.append(update['event_id'])
+            requests.append(service.events().patch(
+                calendarId=calendar_id,
+                eventId=update['event_id'],
+                body=body
+            ))
+
+        errors = _execute_in_batches(service, requests)
+        failures.extend(f"- {event_ids[i]}: {error}" for i, error in sorted(errors.items()))
+
+        if failures:
+            failed = "\n".join(failures)
+            return (
+                f"Updated {len(updates) - len(failures)} of {len(updates)} events.\n"
+                f"Failed updates:\n{failed}"
+            )
+
+        return f"{len(updates)} events updated successfully in calendar {calendar_id}."
+
+    except (HttpError, RefreshError) as error:
+        _reset_service_on_auth_error(error)
+        return f"An error occurred while updating events: {error}"
+
+@tool
+def delete_events(event_ids: list[str], calendar_id: Optional[str] = None):
+    """
+    Delete several existing events from the specified calendar at once.
+
+    Args:
+        event_ids (list[str]): IDs of the events to delete
+        calendar_id (Optional[str]): ID of the calendar (default: primary)
+
+    Returns:
+        str: Confirmation message or error details
+    """
+    try:
+        service = _get_service()
+
+        # Use primary calendar if no ID is provided
+        if not calendar_id:
+            calendar_id = 'primary'
+
+        requests = [
+            service.events().delete(calendarId=calendar_id, eventId=event_id)
+            for event_id in event_ids
+        ]
+
+        errors = _execute_in_batches(service, requests)
+
+        if errors:
+            failed = "\n".join(f"- {event_ids[i]}: {error}" for i, error in sorted(errors.items()))
+            return (
+                f"Deleted {len(requests) - len(errors)} of {len(requests)} events.\n"
+                f"Failed deletions:\n{failed}"
+            )
+
+        return f"{len(requests)} events deleted successfully from calendar {calendar_id}."
+
+    except (HttpError, RefreshError) as error:
+        _reset_service_on_auth_error(error)
+        return f"An error occurred while deleting events: {error}"
@@ -1,24 +1,64 @@
 import subprocess
 import time
 import re
-from difflib import SequenceMatcher
-from .spotify_service import get_spotify_service
+from rapidfuzz import fuzz, utils
 from langchain_core.tools import tool
 
-sp = get_spotify_service()
+# Spotify client, authenticated on first use
+_sp = None
 
-def calculate_similarity(a, b):
+def _get_sp():
     """
-    Calculate string similarity using SequenceMatcher.
-    
+    Retrieve the Spotify client, authenticating on first use.
+
+    Returns:
+        spotipy.Spotify: Authenticated Spotify client
+    """
+    global _sp
+    if _sp is None:
+        from .spotify_service import get_spotify_service
+        _sp = get_spotify_service()
+    return _sp
+
+# Regexes to match variations like "Song by Artist", "Song - Artist"
+_QUERY_PATTERNS = [
+    re.compile(r'^(.+)\s+(?:by|from|of)\s+(.+)$', re.IGNORECASE),  # "Song by Artist"
+    re.compile(r'^(.+)\s*-\s*(.+)$', re.IGNORECASE),               # "Song - Artist"
+]
+
+# Seconds to wait for a device to appear after launching the app, and how often to check
+LAUNCH_TIMEOUT = 5
+LAUNCH_POLL_INTERVAL = 0.25
+
+# Last available devices list and the time it was fetched
+_DEV_CACHE = {'t': 0.0, 'v': None}
+
+def _get_devices(ttl=5):
+    """
+    Retrieve available playback devices, reusing a recent result if possible.
+
+    Empty results are not cached so that a freshly launched app is picked up.
+
     Args:
-        a (str): First string to compare
-        b (str): Second string to compare
-    
+        ttl (float): Number of seconds a cached device list stays valid
+
     Returns:
-        float: Similarity ratio between 0 and 1
+        list: Available playback devices
+    """
+    if _DEV_CACHE['v'] and time.monotonic() - _DEV_CACHE['t'] < ttl:
+        return _DEV_CACHE['v']
+
+    devices = _get_sp().devices()['devices']
+    _DEV_CACHE['t'] = time.monotonic()
+    _DEV_CACHE['v'] = devices
+    return devices
+
+def _invalidate_devices():
+    """
+    Drop the cached device list.
     """
-    return SequenceMatcher(None, a.lower(), b.lower()).ratio()
+    _DEV_CACHE['t'] = 0.0
+    _DEV_CACHE['v'] = None
 
 def parse_query(query):
     """
@@ -30,14 +70,8 @@ def parse_query(query):
     Returns:
         dict: Parsed search parameters
     """
-    # Regex to match variations like "Song by Artist", "Song - Artist", "Song Artist"
-    patterns = [
-        r'^(.+)\s+(?:by|from|of)\s+(.+)$',  # "Song by Artist"
-        r'^(.+)\s*-\s*(.+)$',               # "Song - Artist"
-    ]
-    
-    for pattern in patterns:
-        match = re.match(pattern, query, re.IGNORECASE)
+    for pattern in _QUERY_PATTERNS:
+        match = pattern.match(query)
         if match:
             return {
                 'song': match.group(1).strip(),
@@ -52,18 +86,16 @@ def parse_query(query):
         'search_type': 'track'
     }
 
-@tool
-def search_and_play(query, search_type=None, retrying=False):
+def _choose_track(query, search_type=None):
     """
-    Search for and play music on Spotify with improved relevance and flexibility.
-    
+    Search Spotify and pick the track most relevant to the query.
+
     Args:
         query (str): Search term (can include song and artist)
         search_type (str, optional): Override search type
-        retrying (bool): Flag indicating whether this is a retry attempt
-    
+
     Returns:
-        bool: True if playback started successfully, False otherwise
+        dict: Most relevant track, or None if nothing matched
     """
     # Parse the query
     parsed_query = parse_query(query)
@@ -73,66 +105,113 @@ def search_and_play(query, search_type=None, retrying=False):
         parsed_query['search_type'] = search_type
     
     # Perform search
-    results = sp.search(
+    results = _get_sp().search(
         q=parsed_query['song'], 
         type='track', 
-        limit=20
+        limit=10
     )
     
     # Filter tracks by artist if specified
     tracks = results['tracks']['items']
     if parsed_query['artist']:
-        tracks = [
+        tracks = (
             track for track in tracks 
-            if calculate_similarity(parsed_query['artist'], track['artists'][0]['name']) > 0.6
-        ]
+            if fuzz.ratio(parsed_query['artist'], track['artists'][0]['name'], processor=utils.default_process) > 60
+        )
     
-    # Select most relevant track
+    # Select most relevant track, stopping at the first exact match
     most_relevant_track = None
     highest_similarity = 0
     
     for track in tracks:
-        similarity = calculate_similarity(parsed_query['song'], track['name'])
+        similarity = fuzz.WRatio(parsed_query['song'], track['name'], processor=utils.default_process)
         if similarity > highest_similarity:
             highest_similarity = similarity
             most_relevant_track = track
+            if similarity >= 100:
+                break
     
-    # If no relevant track found
-    if not most_relevant_track:
-        print(f'No track found matching "{query}".')
-        return False
+    return most_relevant_track
 
-    # Playback logic (similar to previous implementation)
-    devices = sp.devices()
-    available_devices = devices['devices']
+def _play_on_any_device(track, allow_launch=True):
+    """
+    Play a track on the active device, or the first available one.
 
-    if available_devices:
-        # Prefer active device
-        for device in available_devices:
-            if device['is_active']:
-                device_id = device['id']
-                sp.start_playback(device_id=device_id, uris=[most_relevant_track['uri']])
-                print(f'Playing "{most_relevant_track["name"]}" by {most_relevant_track["artists"][0]["name"]} on active device: {device["name"]}')
-                return True
-
-        # If no active device, use the first available
-        device_id = available_devices[0]['id']
-        sp.start_playback(device_id=device_id, uris=[most_relevant_track['uri']])
-        print(f'Playing "{most_relevant_track["name"]}" by {most_relevant_track["artists"][0]["name"]} on device: {available_devices[0]["name"]}')
-        return True
+    Args:
+        track (dict): Track to play
+        allow_launch (bool): Whether to launch the Spotify Desktop app when no device is available
+
+    Returns:
+        bool: True if playback started successfully, False otherwise
+    """
+    from spotipy.exceptions import SpotifyException
+
+    sp = _get_sp()
+    available_devices = _get_devices()
 
     # No devices available - attempt to launch Spotify
-    if not retrying:
+    if not available_devices and allow_launch:
         print('No available devices for playback.')
         print('Attempting to launch Spotify Desktop app...')
         try:
             subprocess.run(["open", "-a", "Spotify"])  # macOS-specific
             print("Spotify Desktop app launched.")
-            time.sleep(5)
-            return search_and_play(query, retrying=True)
         except Exception as e:
             print(f"Failed to launch Spotify Desktop app: {e}")
             return False
 
+        # Poll until the app registers a device rather than waiting a fixed delay
+        deadline = time.monotonic() + LAUNCH_TIMEOUT
+        while time.monotonic() < deadline:
+            time.sleep(LAUNCH_POLL_INTERVAL)
+            available_devices = _get_devices()
+            if available_devices:
+                break
+
+    if available_devices:
+        try:
+            # Prefer active device
+            for device in available_devices:
+                if device['is_active']:
+                    device_id = device['id']
+                    sp.start_playback(device_id=device_id, uris=[track['uri']])
+                    print(f'Playing "{track["name"]}" by {track["artists"][0]["name"]} on active device: {device["name"]}')
+                    return True
+
+            # If no active device, use the first available
+            device_id = available_devices[0]['id']
+            sp.start_playback(device_id=device_id, uris=[track['uri']])
+            print(f'Playing "{track["name"]}" by {track["artists"][0]["name"]} on device: {available_devices[0]["name"]}')
+            return True
+        except SpotifyException as e:
+            # The cached device may have disappeared since it was listed
+            if e.http_status == 404:
+                _invalidate_devices()
+            print(f"Failed to start playback: {e}")
+            return False
+
     print("No available devices for playback after retrying.")
-    return False
\ No newline at end of file
+    return False
+
+@tool
+def search_and_play(query, search_type=None, retrying=False):
+    """
+    Search for and play music on Spotify with improved relevance and flexibility.
+    
+    Args:
+        query (str): Search term (can include song and artist)
+        search_type (str, optional): Override search type
+        retrying (bool): Flag indicating whether this is a retry attempt
+    
+    Returns:
+        bool: True if playback started successfully, False otherwise
+    """
+    most_relevant_track = _choose_track(query, search_type)
+    
+    # If no relevant track found
+    if not most_relevant_track:
+        print(f'No track found matching "{query}".')
+        return False
+
+    # Only playback is retried when the app has to be launched; the search is not repeated
+    return _play_on_any_device(most_relevant_track, allow_launch=not retrying)
@@ -1,2 +1,2 @@
-from .weather import current_weather, forecast_weather
+from .weather import current_weather, current_weather_many, forecast_weather
 from .location import find_location
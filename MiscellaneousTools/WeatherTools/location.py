@@ -1,6 +1,11 @@
 import requests
+import orjson
+import requests_cache
 from langchain_core.tools import tool
 
+# Shared keep-alive session caching location lookups for an hour
+_SESSION = requests_cache.CachedSession('location_cache', backend='memory', expire_after=3600, cache_control=True)
+
 @tool
 def find_location() -> str:
     """
@@ -12,12 +17,12 @@ def find_location() -> str:
         str: The country of the user
     """
     try:
-        response = requests.get("https://ipinfo.io/")
-        data = response.json()
+        response = _SESSION.get("https://ipinfo.io/")
+        data = orjson.loads(response.content)
         city = data["city"]
         region = data["region"]
         country = data["country"]
         return city, region, country
-    except requests.RequestException as e:
+    except (requests.RequestException, orjson.JSONDecodeError) as e:
         return f"Error fetching location: {e}"
 
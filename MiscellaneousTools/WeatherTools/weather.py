@@ -1,9 +1,43 @@
+import asyncio
 import requests
+import requests_cache
+import httpx
+import orjson
 import datetime
 from typing import Optional
 from .config import WEATHER_API_KEY
 
-from langchain_core.tools import tool
+from langchain_core.tools import StructuredTool, tool
+
+# Shared keep-alive session caching weather responses for 10 minutes
+_SESSION = requests_cache.CachedSession('weather_cache', backend='memory', expire_after=600, cache_control=True)
+
+# Line format of the hourly forecast highlights
+_HOURLY_FORMAT = "%s: %s°C, %s, Rain Chance: %s%%, Wind: %s km/h"
+
+def _format_current_weather(data: dict) -> str:
+    """
+    Format a current weather API response.
+
+    Args:
+        data (dict): Decoded response of the current weather endpoint
+
+    Returns:
+        str: Detailed current weather information
+    """
+    current = data['current']
+    location_info = data['location']
+    
+    return (
+        f"Current Weather in {location_info['name']}, {location_info['country']}:\n"
+        f"Temperature: {current['temp_c']}°C (Feels like {current['feelslike_c']}°C)\n"
+        f"Condition: {current['condition']['text']}\n"
+        f"Humidity: {current['humidity']}%\n"
+        f"Wind: {current['wind_kph']} km/h {current['wind_dir']} (Gusts up to {current['gust_kph']} km/h)\n"
+        f"Visibility: {current['vis_km']} km\n"
+        f"UV Index: {current['uv']}\n"
+        f"Precipitation: {current['precip_mm']} mm"
+    )
 
 @tool
 def current_weather(location: str) -> str:
@@ -25,29 +59,93 @@ def current_weather(location: str) -> str:
             "aqi": "no"  # No air quality data
         }
         
-        response = requests.get(base_url, params=params)
+        response = _SESSION.get(base_url, params=params)
         response.raise_for_status()
         
-        data = response.json()
-        current = data['current']
-        location_info = data['location']
+        data = orjson.loads(response.content)
         
-        weather_info = (
-            f"Current Weather in {location_info['name']}, {location_info['country']}:\n"
-            f"Temperature: {current['temp_c']}°C (Feels like {current['feelslike_c']}°C)\n"
-            f"Condition: {current['condition']['text']}\n"
-            f"Humidity: {current['humidity']}%\n"
-            f"Wind: {current['wind_kph']} km/h {current['wind_dir']} (Gusts up to {current['gust_kph']} km/h)\n"
-            f"Visibility: {current['vis_km']} km\n"
-            f"UV Index: {current['uv']}\n"
-            f"Precipitation: {current['precip_mm']} mm"
-        )
-        
-        return weather_info
+        return _format_current_weather(data)
     
-    except requests.RequestException as e:
+    except (requests.RequestException, orjson.JSONDecodeError) as e:
         return f"Error fetching current weather: {e}"
 
+def _current_weather_many(locations: list[str]) -> str:
+    """
+    Retrieve current weather for several locations.
+
+    Called through `invoke`, the locations are fetched one after another over
+    the shared session; `ainvoke` fetches them concurrently.
+
+    Args:
+        locations (list[str]): City names to search current weather for
+
+    Returns:
+        str: Detailed current weather information for each location
+    """
+    base_url = "http://api.weatherapi.com/v1/current.json"
+
+    weather_infos = []
+    for location in locations:
+        try:
+            params = {
+                "key": WEATHER_API_KEY,
+                "q": location,
+                "aqi": "no"  # No air quality data
+            }
+
+            response = _SESSION.get(base_url, params=params)
+            response.raise_for_status()
+
+            weather_infos.append(_format_current_weather(orjson.loads(response.content)))
+
+        except (requests.RequestException, orjson.JSONDecodeError) as e:
+            weather_infos.append(f"Error fetching current weather for {location}: {e}")
+
+    return "\n\n".join(weather_infos)
+
+async def _current_weather_many_async(locations: list[str]) -> str:
+    """
+    Retrieve current weather for several locations concurrently.
+
+    Args:
+        locations (list[str]): City names to search current weather for
+
+    Returns:
+        str: Detailed current weather information for each location
+    """
+    base_url = "http://api.weatherapi.com/v1/current.json"
+
+    async def fetch(client, location):
+        params = {
+            "key": WEATHER_API_KEY,
+            "q": location,
+            "aqi": "no"  # No air quality data
+        }
+        response = await client.get(base_url, params=params)
+        response.raise_for_status()
+        return _format_current_weather(orjson.loads(response.content))
+
+    # One client per call: an AsyncClient's connections are bound to the event loop that opened them
+    async with httpx.AsyncClient(timeout=10) as client:
+        results = await asyncio.gather(*[fetch(client, location) for location in locations], return_exceptions=True)
+
+    weather_infos = []
+    for location, result in zip(locations, results):
+        if isinstance(result, (httpx.HTTPError, orjson.JSONDecodeError)):
+            weather_infos.append(f"Error fetching current weather for {location}: {result}")
+        elif isinstance(result, BaseException):
+            raise result
+        else:
+            weather_infos.append(result)
+
+    return "\n\n".join(weather_infos)
+
+current_weather_many = StructuredTool.from_function(
+    func=_current_weather_many,
+    coroutine=_current_weather_many_async,
+    name="current_weather_many"
+)
+
 @tool
 def forecast_weather(location: str, date: Optional[str] = None) -> str:
     """
@@ -71,10 +169,10 @@ def forecast_weather(location: str, date: Optional[str] = None) -> str:
             "aqi": "no"
         }
         
-        response = requests.get(base_url, params=params)
+        response = _SESSION.get(base_url, params=params)
         response.raise_for_status()
         
-        data = response.json()
+        data = orjson.loads(response.content)
         forecast_day = data['forecast']['forecastday'][0] if not date else next(
             (day for day in data['forecast']['forecastday'] if day['date'] == date), 
             data['forecast']['forecastday'][0]
@@ -84,6 +182,10 @@ def forecast_weather(location: str, date: Optional[str] = None) -> str:
         astro = forecast_day['astro']
         
         hour_forecasts = forecast_day['hour']
+        rows = [
+            (hour['time'].rsplit(' ', 1)[-1], hour['temp_c'], hour['condition']['text'], hour['chance_of_rain'], hour['wind_kph'])
+            for hour in hour_forecasts[::3]
+        ]
         
         forecast_info = (
             f"Weather Forecast for {location} on {forecast_day['date']}:\n"
@@ -98,14 +200,10 @@ def forecast_weather(location: str, date: Optional[str] = None) -> str:
             f"Sunset: {astro['sunset']}\n"
             f"Moon Phase: {astro['moon_phase']}\n\n"
             "Hourly Forecast Highlights:\n" +
-            "\n".join([
-                f"{hour['time'].split()[-1]}: {hour['temp_c']}°C, {hour['condition']['text']}, "
-                f"Rain Chance: {hour['chance_of_rain']}%, Wind: {hour['wind_kph']} km/h"
-                for hour in hour_forecasts[::3]
-            ])
+            "\n".join(_HOURLY_FORMAT % row for row in rows)
         )
         
         return forecast_info
     
-    except requests.RequestException as e:
+    except (requests.RequestException, orjson.JSONDecodeError) as e:
         return f"Error fetching weather forecast: {e}"